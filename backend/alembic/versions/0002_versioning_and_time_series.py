@@ -0,0 +1,39 @@
+"""seat version, time_logs index and time_log_rollups
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 12:27:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('seats', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.create_index('ix_time_logs_server_id_created_at', 'time_logs', ['server_id', 'created_at'], unique=False)
+    op.create_table('time_log_rollups',
+    sa.Column('server_id', sa.String(), nullable=False),
+    sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('sample_count', sa.Integer(), nullable=False),
+    sa.Column('synced_count', sa.Integer(), nullable=False),
+    sa.Column('avg_offset', sa.Float(), nullable=False),
+    sa.Column('min_offset', sa.Float(), nullable=False),
+    sa.Column('max_offset', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('server_id', 'bucket')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('time_log_rollups')
+    op.drop_index('ix_time_logs_server_id_created_at', table_name='time_logs')
+    op.drop_column('seats', 'version')
@@ -0,0 +1,32 @@
+"""seat layout (section, row, position)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('seats', sa.Column('section', sa.String(), nullable=True))
+    op.add_column('seats', sa.Column('row', sa.Integer(), nullable=True))
+    op.add_column('seats', sa.Column('position', sa.Integer(), nullable=True))
+    op.create_index('ix_seats_section_row_position', 'seats', ['section', 'row', 'position'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_seats_section_row_position', table_name='seats')
+    op.drop_column('seats', 'position')
+    op.drop_column('seats', 'row')
+    op.drop_column('seats', 'section')
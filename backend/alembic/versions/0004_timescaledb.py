@@ -0,0 +1,95 @@
+"""timescaledb hypertable, continuous aggregate and retention for time_logs
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 13:00:00.000000
+
+Ignorée (sans erreur) hors PostgreSQL, si l'extension timescaledb n'est pas
+disponible sur le serveur, ou avec TIME_SERIES_BACKEND=plain : time_logs reste
+alors une table simple et les agrégats passent par time_log_rollups.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ROLLUP_VIEW = "time_logs_1m"
+
+
+def _timescale_available() -> bool:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or settings.time_series_backend == "plain":
+        return False
+    return bind.execute(sa.text(
+        "SELECT 1 FROM pg_available_extensions WHERE name = 'timescaledb'"
+    )).first() is not None
+
+
+def upgrade() -> None:
+    if not _timescale_available():
+        return
+
+    retention = f"INTERVAL '{int(settings.time_logs_retention_days)} days'"
+    rollup_retention = f"INTERVAL '{int(settings.time_log_rollups_retention_days)} days'"
+
+    # Les DDL d'agrégats continus ne peuvent pas s'exécuter dans une transaction
+    with op.get_context().autocommit_block():
+        op.execute("CREATE EXTENSION IF NOT EXISTS timescaledb")
+
+        is_hypertable = op.get_bind().execute(sa.text(
+            "SELECT 1 FROM timescaledb_information.hypertables "
+            "WHERE hypertable_name = 'time_logs'"
+        )).first()
+        if not is_hypertable:
+            # La colonne de partitionnement doit faire partie de la clé primaire
+            op.execute("ALTER TABLE time_logs DROP CONSTRAINT IF EXISTS time_logs_pkey")
+            op.execute("ALTER TABLE time_logs ALTER COLUMN created_at SET NOT NULL")
+            op.execute("ALTER TABLE time_logs ADD PRIMARY KEY (id, created_at)")
+            op.execute(
+                "SELECT create_hypertable('time_logs', 'created_at', "
+                "chunk_time_interval => INTERVAL '1 day', migrate_data => true)"
+            )
+
+        op.execute(f"""
+            CREATE MATERIALIZED VIEW IF NOT EXISTS {ROLLUP_VIEW}
+            WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+            SELECT server_id,
+                   time_bucket(INTERVAL '1 minute', created_at) AS bucket,
+                   count(*) AS sample_count,
+                   sum(CASE WHEN ntp_synced THEN 1 ELSE 0 END) AS synced_count,
+                   avg(offset_seconds) AS avg_offset,
+                   min(offset_seconds) AS min_offset,
+                   max(offset_seconds) AS max_offset
+            FROM time_logs
+            GROUP BY server_id, bucket
+            WITH NO DATA
+        """)
+        op.execute(
+            f"SELECT add_continuous_aggregate_policy('{ROLLUP_VIEW}', "
+            "start_offset => INTERVAL '1 hour', end_offset => INTERVAL '1 minute', "
+            "schedule_interval => INTERVAL '1 minute', if_not_exists => true)"
+        )
+        op.execute(f"SELECT add_retention_policy('time_logs', {retention}, if_not_exists => true)")
+        op.execute(f"SELECT add_retention_policy('{ROLLUP_VIEW}', {rollup_retention}, if_not_exists => true)")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    ready = bind.execute(sa.text(f"SELECT to_regclass('{ROLLUP_VIEW}') IS NOT NULL")).scalar()
+    if not ready:
+        return
+    # time_logs reste une hypertable (pas de conversion inverse dans TimescaleDB)
+    with op.get_context().autocommit_block():
+        op.execute("SELECT remove_retention_policy('time_logs', if_exists => true)")
+        op.execute(f"DROP MATERIALIZED VIEW IF EXISTS {ROLLUP_VIEW}")
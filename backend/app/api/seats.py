@@ -1,50 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from app.core.database import get_db
-from app.models import Seat as SeatModel
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
+from app.core.responses import json_response
 from app.schemas import Seat, SeatCreate
+from app.services.storage import ReservationStorage, get_storage, get_read_storage
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Seat])
-def get_seats(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def get_seats(skip: int = 0, limit: int = 100, storage: ReservationStorage = Depends(get_read_storage)):
     """Récupérer tous les sièges"""
-    seats = db.query(SeatModel).offset(skip).limit(limit).all()
-    return seats
+    # Dicts sérialisés par orjson : pas de validation Pydantic par ligne
+    return json_response(storage.list_seats(skip, limit))
 
 @router.post("/", response_model=Seat)
-def create_seat(seat: SeatCreate, db: Session = Depends(get_db)):
+def create_seat(seat: SeatCreate, storage: ReservationStorage = Depends(get_storage)):
     """Créer un nouveau siège"""
-    # Vérifier si le siège existe déjà
-    existing_seat = db.query(SeatModel).filter(SeatModel.number == seat.number).first()
-    if existing_seat:
-        raise HTTPException(status_code=400, detail="Seat number already exists")
-    
-    db_seat = SeatModel(**seat.dict())
-    db.add(db_seat)
-    db.commit()
-    db.refresh(db_seat)
-    return db_seat
+    return storage.create_seat(seat.number, seat.section, seat.row, seat.position)
+
+@router.get("/search", response_model=List[Seat])
+def search_seats(
+    quantity: int = Query(1, ge=1, le=20),
+    section: Optional[str] = None,
+    storage: ReservationStorage = Depends(get_storage)
+):
+    """Meilleures places contiguës disponibles (sans les réserver)"""
+    return json_response(storage.search_seats(quantity, section))
 
 @router.get("/{seat_id}", response_model=Seat)
-def get_seat(seat_id: int, db: Session = Depends(get_db)):
+def get_seat(seat_id: int, storage: ReservationStorage = Depends(get_storage)):
     """Récupérer un siège par ID"""
-    seat = db.query(SeatModel).filter(SeatModel.id == seat_id).first()
-    if seat is None:
-        raise HTTPException(status_code=404, detail="Seat not found")
-    return seat
+    return storage.get_seat(seat_id)
 
 @router.post("/initialize")
-def initialize_seats(total_seats: int = 100, db: Session = Depends(get_db)):
+def initialize_seats(
+    total_seats: int = 100,
+    seats_per_row: int = Query(10, ge=1),
+    rows_per_section: int = Query(5, ge=1),
+    storage: ReservationStorage = Depends(get_storage)
+):
     """Initialiser les sièges (pour le setup initial)"""
-    # Supprimer les sièges existants
-    db.query(SeatModel).delete()
-    
-    # Créer les nouveaux sièges
-    for i in range(1, total_seats + 1):
-        seat = SeatModel(number=i, is_available=True)
-        db.add(seat)
-    
-    db.commit()
+    storage.initialize_seats(total_seats, seats_per_row, rows_per_section)
     return {"message": f"{total_seats} seats initialized successfully"}
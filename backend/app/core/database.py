@@ -1,4 +1,13 @@
-from sqlalchemy import create_engine, MetaData
+import ast
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Set, Tuple
+from fastapi import Request
+from sqlalchemy import create_engine, MetaData, inspect, text
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
@@ -6,15 +15,139 @@ from app.core.config import settings
 engine = create_engine(settings.database_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Réplique en lecture seule (à défaut, le primaire)
+if settings.database_replica_url:
+    read_engine = create_engine(settings.database_replica_url)
+else:
+    read_engine = engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
 Base = declarative_base()
 
-def get_db():
+# Dernière écriture par client (time.monotonic), pour éviter de lire une réplique en retard.
+# _write_log garde les écritures dans l'ordre chronologique pour expirer les entrées.
+_last_write: Dict[str, float] = {}
+_write_log: Deque[Tuple[float, str]] = deque()
+_write_lock = threading.Lock()
+_SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+def client_key(request: Request) -> str:
+    """
+    Identifiant du client : en-tête X-Client-Id, sinon adresse IP. Derrière
+    nginx, l'adresse du client est la dernière entrée de X-Forwarded-For
+    (ajoutée par le proxy lui-même, le client ne peut pas la falsifier).
+    """
+    client_id = request.headers.get("X-Client-Id")
+    if client_id:
+        return client_id
+    if settings.trust_forwarded_for:
+        forwarded = request.headers.get("X-Forwarded-For")
+        if forwarded:
+            return forwarded.rsplit(",", 1)[-1].strip()
+    return request.client.host if request.client else "anonymous"
+
+def mark_write(key: str):
+    now = time.monotonic()
+    cutoff = now - settings.replica_staleness_window
+    with _write_lock:
+        _last_write[key] = now
+        _write_log.append((now, key))
+        while _write_log[0][0] < cutoff:
+            written_at, old_key = _write_log.popleft()
+            # Entrée remplacée par une écriture plus récente du même client
+            if _last_write.get(old_key) == written_at:
+                del _last_write[old_key]
+
+def wrote_recently(key: str) -> bool:
+    last = _last_write.get(key)
+    return last is not None and time.monotonic() - last < settings.replica_staleness_window
+
+def get_db(request: Request):
+    if request.method not in _SAFE_METHODS:
+        mark_write(client_key(request))
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
 
+def get_read_db(request: Request):
+    """Session de lecture : réplique, sauf si le client vient d'écrire"""
+    if read_engine is engine or wrote_recently(client_key(request)):
+        db = SessionLocal()
+    else:
+        db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+MIGRATIONS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "alembic", "versions"
+)
+_REVISION_RE = re.compile(r"^(revision|down_revision)\s*(?::[^=]*)?=\s*(.+)$", re.MULTILINE)
+
+def migration_heads() -> Set[str]:
+    """
+    Révisions Alembic de tête, lues directement dans alembic/versions
+    (importer alembic.script coûte plusieurs centaines de ms au démarrage).
+    """
+    revisions, parents = set(), set()
+    if not os.path.isdir(MIGRATIONS_DIR):
+        return revisions
+    for name in os.listdir(MIGRATIONS_DIR):
+        if not name.endswith(".py"):
+            continue
+        with open(os.path.join(MIGRATIONS_DIR, name), encoding="utf-8") as f:
+            for key, value in _REVISION_RE.findall(f.read()):
+                value = ast.literal_eval(value.strip())
+                if key == "revision":
+                    revisions.add(value)
+                elif isinstance(value, str):
+                    parents.add(value)
+                elif value:
+                    parents.update(value)
+    return revisions - parents
+
+def current_revisions() -> Optional[Set[str]]:
+    """Révisions enregistrées dans alembic_version (None si la table n'existe pas)"""
+    try:
+        with engine.connect() as conn:
+            return {row[0] for row in conn.execute(text("SELECT version_num FROM alembic_version"))}
+    except SQLAlchemyError:
+        return None
+
+def schema_is_current() -> bool:
+    """La base est-elle à la révision Alembic de tête ?"""
+    heads = migration_heads()
+    return bool(heads) and current_revisions() == heads
+
+def _upgrade_head():
+    """Appliquer les migrations Alembic jusqu'à la tête (base vide)"""
+    from alembic import command
+    from alembic.config import Config
+
+    # Sans alembic.ini : ne pas reconfigurer le logging de l'application
+    config = Config()
+    config.set_main_option("script_location", os.path.dirname(MIGRATIONS_DIR))
+    config.set_main_option("sqlalchemy.url", settings.database_url.replace("%", "%%"))
+    command.upgrade(config, "head")
+
 async def create_tables():
     """Créer les tables si elles n'existent pas"""
-    Base.metadata.create_all(bind=engine)
+    from app.services.time_series import setup_time_series
+
+    mode = settings.schema_management
+    if mode == "create_all":
+        Base.metadata.create_all(bind=engine)
+    elif mode == "auto" and not schema_is_current():
+        if not inspect(engine).has_table("seats"):
+            # Base vide : migrations complètes (dont TimescaleDB si disponible)
+            _upgrade_head()
+        elif current_revisions() is None:
+            # create_all n'ajoute pas de colonnes aux tables existantes
+            print("Schéma existant sans révision Alembic : exécuter "
+                  "'alembic stamp 0001' puis 'alembic upgrade head'")
+        else:
+            print("Schéma en retard sur les migrations : exécuter 'alembic upgrade head'")
+    setup_time_series(engine)
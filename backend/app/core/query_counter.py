@@ -0,0 +1,30 @@
+from contextlib import contextmanager
+from typing import Iterator, List
+from sqlalchemy import event
+from app.core.database import engine, read_engine
+
+class QueryCounter:
+    """Compteur des requêtes SQL émises sur les moteurs primaire et réplique"""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    """Compter les requêtes SQL exécutées dans le bloc"""
+    counter = QueryCounter()
+    engines = {engine, read_engine}
+    for e in engines:
+        event.listen(e, "before_cursor_execute", counter._on_execute)
+    try:
+        yield counter
+    finally:
+        for e in engines:
+            event.remove(e, "before_cursor_execute", counter._on_execute)
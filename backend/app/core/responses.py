@@ -0,0 +1,10 @@
+from typing import Any
+import orjson
+from fastapi import Response
+
+def json_response(payload: Any) -> Response:
+    """Réponse JSON sérialisée directement par orjson (sans passer par Pydantic)"""
+    return Response(
+        content=orjson.dumps(payload, option=orjson.OPT_UTC_Z),
+        media_type="application/json"
+    )
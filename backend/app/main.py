@@ -1,8 +1,14 @@
+import time as _time
+
+_import_started = _time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import reservations, seats, time, simulation
+from app.api import time
 from app.core.config import settings
 from app.core.database import create_tables
+from app.services.write_buffer import write_buffer
+from app.services.time_series import get_backend, rollup_refresher
 
 app = FastAPI(
     title="Ticket Reservation NTP Demo",
@@ -19,16 +25,41 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Routers
+# Routers (seuls les sous-systèmes activés sont importés)
+from app.api import reservations, seats
 app.include_router(seats.router, prefix="/api/seats", tags=["seats"])
 app.include_router(reservations.router, prefix="/api/reservations", tags=["reservations"])
 app.include_router(time.router, prefix="/api/time", tags=["time"])
-app.include_router(simulation.router, prefix="/api/simulation", tags=["simulation"])
+if settings.simulation_enabled:
+    from app.api import simulation
+    app.include_router(simulation.router, prefix="/api/simulation", tags=["simulation"])
+
+startup_timings = {
+    "import_ms": round((_time.perf_counter() - _import_started) * 1000, 1)
+}
 
 @app.on_event("startup")
 async def startup_event():
     """Initialisation au démarrage"""
-    await create_tables()
+    started = _time.perf_counter()
+    if settings.storage_backend != "memory":
+        # Stockage en mémoire : aucune connexion à la base
+        await create_tables()
+    startup_timings["schema_ms"] = round((_time.perf_counter() - started) * 1000, 1)
+    if settings.storage_backend != "memory":
+        if settings.write_buffer_enabled:
+            write_buffer.start()
+        if get_backend() == "plain" and settings.time_log_rollup_interval > 0:
+            rollup_refresher.start()
+    startup_timings["startup_ms"] = round((_time.perf_counter() - started) * 1000, 1)
+    print(f"Démarrage: import {startup_timings['import_ms']} ms, "
+          f"schéma {startup_timings['schema_ms']} ms, startup {startup_timings['startup_ms']} ms")
+
+@app.on_event("shutdown")
+def shutdown_event():
+    """Vider le buffer d'écriture avant l'arrêt"""
+    rollup_refresher.stop()
+    write_buffer.stop()
 
 @app.get("/")
 async def root():
@@ -37,3 +68,12 @@ async def root():
         "docs": "/docs",
         "version": "1.0.0"
     }
+
+@app.get("/metrics")
+def metrics():
+    """Compteurs internes (buffer d'écriture, agrégats, temps de démarrage)"""
+    return {
+        "write_buffer": write_buffer.stats(),
+        "rollups": rollup_refresher.stats(),
+        "startup": startup_timings
+    }
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Float, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Float, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -8,11 +8,22 @@ class Seat(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     number = Column(Integer, unique=True, nullable=False, index=True)
+    section = Column(String, nullable=True)
+    row = Column(Integer, nullable=True)
+    position = Column(Integer, nullable=True)  # place dans le rang, à partir de 1
     is_available = Column(Boolean, default=True)
+    version = Column(Integer, nullable=False, server_default="1")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
-    # Relations
-    reservations = relationship("Reservation", back_populates="seat")
+    # Relations (jamais chargées implicitement : utiliser une jointure ou selectinload)
+    reservations = relationship("Reservation", back_populates="seat", lazy="raise_on_sql")
+    
+    # Verrouillage optimiste : chaque UPDATE vérifie et incrémente la version
+    __mapper_args__ = {"version_id_col": version}
+    
+    __table_args__ = (
+        Index("ix_seats_section_row_position", "section", "row", "position"),
+    )
 
 class Reservation(Base):
     __tablename__ = "reservations"
@@ -25,7 +36,7 @@ class Reservation(Base):
     ntp_synced = Column(Boolean, default=False)
     
     # Relations
-    seat = relationship("Seat", back_populates="reservations")
+    seat = relationship("Seat", back_populates="reservations", lazy="raise_on_sql")
 
 class TimeLog(Base):
     __tablename__ = "time_logs"
@@ -37,6 +48,22 @@ class TimeLog(Base):
     offset_seconds = Column(Float, default=0.0)
     ntp_server = Column(String, default="pool.ntp.org")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_time_logs_server_id_created_at", "server_id", "created_at"),
+    )
+
+class TimeLogRollup(Base):
+    """Agrégat par minute des offsets NTP (fallback sans TimescaleDB)"""
+    __tablename__ = "time_log_rollups"
+    
+    server_id = Column(String, primary_key=True)
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+    sample_count = Column(Integer, nullable=False, default=0)
+    synced_count = Column(Integer, nullable=False, default=0)
+    avg_offset = Column(Float, nullable=False, default=0.0)
+    min_offset = Column(Float, nullable=False, default=0.0)
+    max_offset = Column(Float, nullable=False, default=0.0)
 
 class Conflict(Base):
     __tablename__ = "conflicts"
@@ -49,4 +76,4 @@ class Conflict(Base):
     resolved = Column(Boolean, default=False)
     
     # Relations
-    seat = relationship("Seat")
+    seat = relationship("Seat", lazy="raise_on_sql")
@@ -1,9 +1,12 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional, List
 
 class SeatBase(BaseModel):
     number: int
+    section: Optional[str] = None
+    row: Optional[int] = None
+    position: Optional[int] = None
 
 class SeatCreate(SeatBase):
     pass
@@ -33,6 +36,10 @@ class Reservation(ReservationBase):
     class Config:
         from_attributes = True
 
+class BestAvailableRequest(ReservationBase):
+    quantity: int = Field(1, ge=1, le=20)
+    section: Optional[str] = None
+
 class TimeLogBase(BaseModel):
     server_id: str
     ntp_synced: bool = False
@@ -50,6 +57,18 @@ class TimeLog(TimeLogBase):
     class Config:
         from_attributes = True
 
+class TimeLogRollup(BaseModel):
+    server_id: str
+    bucket: datetime
+    sample_count: int
+    synced_count: int
+    avg_offset: float
+    min_offset: float
+    max_offset: float
+    
+    class Config:
+        from_attributes = True
+
 class ConflictBase(BaseModel):
     seat_id: int
     time_difference_seconds: float
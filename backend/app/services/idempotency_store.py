@@ -0,0 +1,106 @@
+"""
+Stockage des réponses associées aux en-têtes Idempotency-Key.
+
+Une requête rejouée avec la même clé reçoit la réponse mémorisée sans
+réexécuter le traitement (ni toucher aux tables). Les entrées expirent après
+settings.idempotency_ttl_seconds et le nombre de clés est borné (éviction des
+plus anciennes).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.services.storage import ConcurrentModification
+
+_PENDING = object()
+
+class IdempotencyStore:
+    def __init__(self, ttl_seconds: float, max_keys: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_keys = max_keys
+        # clé -> (expiration, empreinte, status_code, body)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict(self, now: float):
+        # Les entrées sont triées par date d'insertion, donc par expiration
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry[0] > now and len(self._entries) < self.max_keys:
+                break
+            del self._entries[key]
+
+    def begin(self, key: str, fingerprint: str) -> Optional[tuple]:
+        """
+        Réserver une clé. Retourne None si le traitement doit être exécuté,
+        sinon l'entrée existante (empreinte, status_code, body).
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry[1:]
+            self._entries[key] = (now + self.ttl_seconds, fingerprint, _PENDING, None)
+            return None
+
+    def complete(self, key: str, fingerprint: str, status_code: int, body: Any):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, fingerprint, status_code, body)
+
+    def discard(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+idempotency_store = IdempotencyStore(
+    ttl_seconds=settings.idempotency_ttl_seconds,
+    max_keys=settings.idempotency_max_keys,
+)
+
+def run_idempotent(key: Optional[str], fingerprint: str, handler: Callable[[], Any]) -> Any:
+    """
+    Exécuter handler une seule fois par clé d'idempotence.
+    handler doit retourner un corps sérialisable (dict) ; les HTTPException
+    4xx sont mémorisées et relancées à l'identique lors des rejeux, sauf les
+    conflits transitoires (ConcurrentModification).
+    """
+    if not key:
+        return handler()
+
+    entry = idempotency_store.begin(key, fingerprint)
+    if entry is not None:
+        stored_fingerprint, status_code, body = entry
+        if stored_fingerprint != fingerprint:
+            raise HTTPException(status_code=422, detail="Idempotency-Key reused with a different request")
+        if status_code is _PENDING:
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is in progress")
+        if status_code >= 400:
+            raise HTTPException(status_code=status_code, detail=body)
+        return body
+
+    try:
+        body = handler()
+    except ConcurrentModification:
+        # Conflit transitoire : un renvoi avec la même clé doit pouvoir réussir
+        idempotency_store.discard(key)
+        raise
+    except HTTPException as e:
+        if e.status_code < 500:
+            idempotency_store.complete(key, fingerprint, e.status_code, e.detail)
+        else:
+            idempotency_store.discard(key)
+        raise
+    except Exception:
+        idempotency_store.discard(key)
+        raise
+
+    idempotency_store.complete(key, fingerprint, 200, body)
+    return body
@@ -0,0 +1,350 @@
+"""
+Moteur de réservation en mémoire (sièges, réservations, conflits).
+
+Même logique que SqlReservationStorage (fenêtre de drift de 10 secondes,
+détection de conflits sur les heures corrigées, meilleures places contiguës),
+sans base de données : les enregistrements sont des objets à __slots__ rangés
+dans des listes indexées par ID, avec un index par siège trié par heure de
+réservation et un SeatAllocator propre au moteur. Sélectionné par
+settings.storage_backend = "memory", ou utilisé directement pour rejouer des
+scénarios de simulation (voir replay).
+"""
+import json
+import threading
+import time
+from bisect import insort
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.services.seat_allocator import SeatAllocator, seat_layout
+from app.services.storage import ReservationStorage
+from app.services.time_offsets_store import time_offsets
+
+CONFLICT_WINDOW_SECONDS = 10.0
+CONFLICT_LOOKBACK = 10
+
+def _to_datetime(ts: float) -> datetime:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).replace(tzinfo=None)
+
+class SeatRecord:
+    __slots__ = ("id", "number", "is_available", "version", "created_at", "section", "row", "position")
+
+    def __init__(self, id: int, number: int, created_at: float, section: Optional[str] = None,
+                 row: Optional[int] = None, position: Optional[int] = None):
+        self.id = id
+        self.number = number
+        self.is_available = True
+        self.version = 1
+        self.created_at = created_at
+        self.section = section
+        self.row = row
+        self.position = position
+
+    def to_dict(self) -> dict:
+        return {
+            "number": self.number,
+            "id": self.id,
+            "is_available": self.is_available,
+            "created_at": _to_datetime(self.created_at),
+            "section": self.section,
+            "row": self.row,
+            "position": self.position,
+        }
+
+class ReservationRecord:
+    __slots__ = ("id", "seat_id", "customer_name", "reserved_at", "server_id", "ntp_synced")
+
+    def __init__(self, id: int, seat_id: int, customer_name: str, reserved_at: float,
+                 server_id: str, ntp_synced: bool):
+        self.id = id
+        self.seat_id = seat_id
+        self.customer_name = customer_name
+        self.reserved_at = reserved_at
+        self.server_id = server_id
+        self.ntp_synced = ntp_synced
+
+class ConflictRecord:
+    __slots__ = ("id", "seat_id", "reservation_ids", "detected_at", "time_difference_seconds", "resolved")
+
+    def __init__(self, id: int, seat_id: int, reservation_ids: Tuple[int, ...], detected_at: float,
+                 time_difference_seconds: float):
+        self.id = id
+        self.seat_id = seat_id
+        self.reservation_ids = reservation_ids
+        self.detected_at = detected_at
+        self.time_difference_seconds = time_difference_seconds
+        self.resolved = False
+
+    def to_dict(self) -> dict:
+        return {
+            "seat_id": self.seat_id,
+            "time_difference_seconds": self.time_difference_seconds,
+            "id": self.id,
+            "reservation_ids": json.dumps([str(i) for i in self.reservation_ids]),
+            "detected_at": _to_datetime(self.detected_at),
+            "resolved": self.resolved,
+        }
+
+class MemoryReservationStore(ReservationStorage):
+    def __init__(self, offsets: Optional[Dict[str, float]] = None):
+        # Par défaut, les décalages partagés avec /api/simulation
+        self.offsets = time_offsets if offsets is None else offsets
+        self._lock = threading.Lock()
+        self._allocator = SeatAllocator()
+        # Dernière synchronisation NTP par serveur (pas de table time_logs en mémoire)
+        self._last_sync: Dict[str, datetime] = {}
+        self.reset()
+
+    def reset(self):
+        # Listes indexées par ID - 1 ; une réservation annulée laisse un None
+        self._seats: List[Optional[SeatRecord]] = []
+        self._seat_ids_by_number: Dict[int, int] = {}
+        self._reservations: List[Optional[ReservationRecord]] = []
+        self._conflicts: List[ConflictRecord] = []
+        # Par siège : (reserved_at, reservation_id) triés par heure de réservation
+        self._by_seat: Dict[int, List[Tuple[float, int]]] = {}
+        self._allocator.load([])
+        self.rejected = 0
+
+    # Sièges
+
+    def initialize_seats(self, total_seats: int, seats_per_row: int = 10, rows_per_section: int = 5):
+        with self._lock:
+            self.reset()
+            now = time.time()
+            self._seats = [
+                SeatRecord(i, i, now, *seat_layout(i, seats_per_row, rows_per_section))
+                for i in range(1, total_seats + 1)
+            ]
+            self._seat_ids_by_number = {i: i for i in range(1, total_seats + 1)}
+            self._allocator.load(
+                (s.id, s.section, s.row, s.position, s.is_available) for s in self._seats
+            )
+
+    def create_seat(self, number: int, section: Optional[str] = None, row: Optional[int] = None,
+                    position: Optional[int] = None) -> dict:
+        with self._lock:
+            if number in self._seat_ids_by_number:
+                raise HTTPException(status_code=400, detail="Seat number already exists")
+            seat = SeatRecord(len(self._seats) + 1, number, time.time(), section, row, position)
+            self._seats.append(seat)
+            self._seat_ids_by_number[number] = seat.id
+            self._allocator.add_seat(seat.id, section, row, position)
+            return seat.to_dict()
+
+    def _get_seat(self, seat_id: int) -> Optional[SeatRecord]:
+        if 1 <= seat_id <= len(self._seats):
+            return self._seats[seat_id - 1]
+        return None
+
+    def get_seat(self, seat_id: int) -> dict:
+        seat = self._get_seat(seat_id)
+        if seat is None:
+            raise HTTPException(status_code=404, detail="Seat not found")
+        return seat.to_dict()
+
+    def list_seats(self, skip: int = 0, limit: int = 100) -> List[dict]:
+        return [s.to_dict() for s in self._seats[skip:skip + limit] if s is not None]
+
+    def search_seats(self, quantity: int, section: Optional[str] = None) -> List[dict]:
+        found = self._allocator.find(None, quantity, section)
+        if found is None:
+            return []
+        return [self._get_seat(seat_id).to_dict() for seat_id in found[1]]
+
+    # Réservations
+
+    def _current_time(self, server_id: str, base_time: Optional[float]) -> Tuple[float, bool]:
+        now = time.time() if base_time is None else base_time
+        if server_id in self.offsets:
+            return now + self.offsets[server_id], False
+        return now, True
+
+    def try_reserve(self, seat_id: int, customer_name: str, server_id: str = "server-1",
+                    base_time: Optional[float] = None) -> Optional[ReservationRecord]:
+        """
+        Réserver un siège. Retourne None si le siège est déjà réservé
+        (hors fenêtre de concurrence) ; lève une 404 si le siège n'existe pas.
+        """
+        with self._lock:
+            seat = self._get_seat(seat_id)
+            if seat is None:
+                raise HTTPException(status_code=404, detail="Seat not found")
+
+            now, ntp_synced = self._current_time(server_id, base_time)
+            index = self._by_seat.get(seat_id)
+
+            if not seat.is_available and not self._in_drift_window(index, server_id, now):
+                self.rejected += 1
+                return None
+
+            record = ReservationRecord(
+                len(self._reservations) + 1, seat_id, customer_name, now, server_id, ntp_synced
+            )
+            self._reservations.append(record)
+            if index is None:
+                index = self._by_seat[seat_id] = []
+            insort(index, (now, record.id))
+
+            if seat.is_available:
+                self._allocator.set_available(seat_id, False)
+            seat.is_available = False
+            seat.version += 1
+
+            if len(index) > 1:
+                self._check_conflicts(seat_id, index)
+            return record
+
+    def _in_drift_window(self, index: Optional[List[Tuple[float, int]]], server_id: str, now: float) -> bool:
+        """Même règle que le chemin SQL : autre serveur, autre décalage, moins de 10 secondes"""
+        if not settings.drift_window_enabled or not index:
+            return False
+        last_at, last_id = index[-1]
+        last_server = self._reservations[last_id - 1].server_id
+        if last_server == server_id or self.offsets.get(last_server, 0.0) == self.offsets.get(server_id, 0.0):
+            return False
+        return abs(now - last_at) <= CONFLICT_WINDOW_SECONDS
+
+    def _check_conflicts(self, seat_id: int, index: List[Tuple[float, int]]):
+        """Détecter un conflit réel basé sur les heures corrigées du drift"""
+        recent = index[-CONFLICT_LOOKBACK:]
+        offsets = self.offsets
+        seen_offsets = set()
+        low = high = None
+        for reserved_at, reservation_id in recent:
+            server_id = self._reservations[reservation_id - 1].server_id
+            offset = offsets.get(server_id, 0.0)
+            seen_offsets.add(offset)
+            corrected = reserved_at - offset
+            if low is None or corrected < low:
+                low = corrected
+            if high is None or corrected > high:
+                high = corrected
+
+        # Pas de conflit s'il n'y a qu'un seul offset (i.e. serveurs synchronisés)
+        if len(seen_offsets) <= 1:
+            return
+
+        time_diff = high - low
+        if time_diff <= CONFLICT_WINDOW_SECONDS:
+            self._conflicts.append(ConflictRecord(
+                len(self._conflicts) + 1,
+                seat_id,
+                tuple(reservation_id for _, reservation_id in reversed(recent)),
+                time.time(),
+                time_diff,
+            ))
+
+    def reserve(self, seat_id: int, customer_name: str, server_id: str = "server-1") -> dict:
+        record = self.try_reserve(seat_id, customer_name, server_id)
+        if record is None:
+            raise HTTPException(status_code=400, detail="Seat is already reserved")
+        return self._reservation_dict(record)
+
+    def reserve_best_available(self, customer_name: str, quantity: int, section: Optional[str] = None,
+                               server_id: str = "server-1") -> List[dict]:
+        with self._lock:
+            found = self._allocator.find(None, quantity, section)
+            if found is None:
+                raise HTTPException(status_code=409, detail="Not enough contiguous seats available")
+            now, ntp_synced = self._current_time(server_id, None)
+            records = []
+            for seat_id in found[1]:
+                record = ReservationRecord(
+                    len(self._reservations) + 1, seat_id, customer_name, now, server_id, ntp_synced
+                )
+                self._reservations.append(record)
+                insort(self._by_seat.setdefault(seat_id, []), (now, record.id))
+                seat = self._get_seat(seat_id)
+                seat.is_available = False
+                seat.version += 1
+                self._allocator.set_available(seat_id, False)
+                records.append(record)
+            return [self._reservation_dict(record) for record in records]
+
+    def cancel(self, reservation_id: int) -> dict:
+        with self._lock:
+            record = None
+            if 1 <= reservation_id <= len(self._reservations):
+                record = self._reservations[reservation_id - 1]
+            if record is None:
+                raise HTTPException(status_code=404, detail="Reservation not found")
+
+            self._reservations[reservation_id - 1] = None
+            index = self._by_seat[record.seat_id]
+            index.remove((record.reserved_at, record.id))
+
+            seat = self._get_seat(record.seat_id)
+            if seat is not None:
+                seat.is_available = True
+                seat.version += 1
+                self._allocator.set_available(seat.id, True)
+        return {"message": "Reservation cancelled successfully"}
+
+    def _reservation_dict(self, record: ReservationRecord) -> dict:
+        seat = self._get_seat(record.seat_id)
+        return {
+            "customer_name": record.customer_name,
+            "id": record.id,
+            "seat_id": record.seat_id,
+            "reserved_at": _to_datetime(record.reserved_at),
+            "server_id": record.server_id,
+            "ntp_synced": record.ntp_synced,
+            "seat": seat.to_dict() if seat is not None else None,
+        }
+
+    def list_reservations(self, skip: int = 0, limit: int = 100) -> List[dict]:
+        result = []
+        for record in self._reservations:
+            if record is None:
+                continue
+            if skip:
+                skip -= 1
+                continue
+            if len(result) >= limit:
+                break
+            result.append(self._reservation_dict(record))
+        return result
+
+    def list_conflicts(self) -> List[dict]:
+        return [c.to_dict() for c in self._conflicts]
+
+    # Synchronisation NTP
+
+    def record_sync(self, server_id: str, at: datetime, ntp_synced: bool, offset_seconds: float):
+        self._last_sync[server_id] = at
+
+    def last_sync(self, server_id: str) -> Optional[datetime]:
+        return self._last_sync.get(server_id)
+
+    def time_history(self, server_id: str, since: datetime) -> List[dict]:
+        raise HTTPException(status_code=404, detail="Time history requires the SQL storage backend")
+
+    # Rejeu
+
+    def replay(self, events: Iterable[Tuple[int, str, str, float]]) -> dict:
+        """
+        Rejouer des événements (seat_id, customer_name, server_id, base_time)
+        où base_time est l'heure de référence (epoch) de la tentative.
+        """
+        started = time.perf_counter()
+        attempts = accepted = 0
+        for seat_id, customer_name, server_id, base_time in events:
+            attempts += 1
+            if self.try_reserve(seat_id, customer_name, server_id, base_time) is not None:
+                accepted += 1
+        elapsed = time.perf_counter() - started
+        return {
+            "attempts": attempts,
+            "accepted": accepted,
+            "rejected": attempts - accepted,
+            "conflicts": len(self._conflicts),
+            "seats_with_conflicts": len({c.seat_id for c in self._conflicts}),
+            "elapsed_seconds": elapsed,
+            "events_per_second": attempts / elapsed if elapsed else 0.0,
+        }
+
+memory_store = MemoryReservationStore()
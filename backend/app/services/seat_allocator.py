@@ -0,0 +1,224 @@
+"""
+Index des places libres par rang pour l'allocation "meilleures places".
+
+Chaque rang (section, rang) garde un bitmap des positions libres (bit p-1 pour
+la position p). Chercher N places contiguës revient à un ET entre le bitmap et
+ses décalages, ce qui donne directement les positions de départ possibles.
+Les rangs sont parcourus du meilleur au moins bon : section dans l'ordre de
+section_name (A..Z, puis AA..AZ, BA...), puis rang croissant (le plus proche
+de la scène).
+
+L'index est chargé depuis la base au premier usage et tenu à jour par les
+réservations / annulations de ce processus. C'est une indication : la
+réservation effective reste un UPDATE conditionnel sur is_available, un rang
+est rechargé depuis la base si la réservation échoue, et l'index entier est
+rechargé avant de répondre qu'aucun bloc n'est disponible (places libérées ou
+ajoutées par d'autres workers), au plus une fois par
+settings.seat_index_reload_interval. La requête de rechargement s'exécute hors
+du verrou : les recherches et mises à jour continuent sur l'ancien index
+jusqu'à l'échange.
+"""
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Seat as SeatModel
+
+RowKey = Tuple[str, int]
+
+def section_name(index: int) -> str:
+    """0 -> A, 25 -> Z, 26 -> AA..."""
+    name = ""
+    index += 1
+    while index:
+        index, rest = divmod(index - 1, 26)
+        name = chr(ord("A") + rest) + name
+    return name
+
+def seat_layout(number: int, seats_per_row: int, rows_per_section: int) -> Tuple[str, int, int]:
+    """(section, rang, position) du siège number, numérotés à partir de 1"""
+    row_index, position = divmod(number - 1, seats_per_row)
+    section_index, row = divmod(row_index, rows_per_section)
+    return section_name(section_index), row + 1, position + 1
+
+def row_order(key: RowKey) -> Tuple[int, str, int]:
+    """Clé de tri des rangs : "B" avant "AA" (ordre de section_name), puis rang"""
+    section, row = key
+    return len(section), section, row
+
+def _runs_start_mask(free: int, quantity: int) -> int:
+    """Bits p tels que les positions p..p+quantity-1 sont toutes libres"""
+    mask, span = free, 1
+    while span < quantity and mask:
+        step = min(span, quantity - span)
+        mask &= mask >> step
+        span += step
+    return mask
+
+class RowIndex:
+    __slots__ = ("free", "seat_ids", "width")
+
+    def __init__(self):
+        self.free = 0
+        self.seat_ids: Dict[int, int] = {}  # position -> seat_id
+        self.width = 0
+
+def _add(rows: Dict[RowKey, RowIndex], seat_rows: Dict[int, Tuple[RowKey, int]],
+         seat_id: int, section: str, row: int, position: int, is_available: bool) -> bool:
+    """Ajouter un siège à l'index ; retourne True si le rang est nouveau (à trier)"""
+    key = (section, row)
+    index = rows.get(key)
+    created = index is None
+    if created:
+        index = rows[key] = RowIndex()
+    index.seat_ids[position] = seat_id
+    index.width = max(index.width, position)
+    if is_available:
+        index.free |= 1 << (position - 1)
+    seat_rows[seat_id] = (key, position)
+    return created
+
+class SeatAllocator:
+    def __init__(self, reload_interval: float = 0.0):
+        # Délai minimal entre deux rechargements complets après une recherche infructueuse
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._loaded_at = 0.0
+        self.invalidate()
+
+    def invalidate(self):
+        """Oublier l'index (rechargé au prochain usage)"""
+        with self._lock:
+            self._reset()
+
+    def _reset(self):
+        self._rows: Dict[RowKey, RowIndex] = {}
+        self._ordered: List[RowKey] = []
+        self._seat_rows: Dict[int, Tuple[RowKey, int]] = {}
+        self._loaded = False
+
+    def _swap(self, seats: Iterable[Tuple[int, str, int, int, bool]]):
+        # Index construit hors verrou, remplacé d'un bloc
+        rows: Dict[RowKey, RowIndex] = {}
+        seat_rows: Dict[int, Tuple[RowKey, int]] = {}
+        for seat_id, section, row, position, is_available in seats:
+            _add(rows, seat_rows, seat_id, section, row, position, is_available)
+        ordered = sorted(rows, key=row_order)
+        with self._lock:
+            self._rows, self._ordered, self._seat_rows = rows, ordered, seat_rows
+            self._loaded = True
+            self._loaded_at = time.monotonic()
+
+    def load(self, seats: Iterable[Tuple[int, str, int, int, bool]]):
+        """Charger l'index depuis des (seat_id, section, rang, position, disponible)"""
+        self._swap(seats)
+
+    def _reload(self, db: Session, wait: bool):
+        """
+        Recharger l'index depuis la base (requête hors du verrou principal).
+        Un seul rechargement à la fois : sans wait, on ne fait rien si un
+        autre est déjà en cours.
+        """
+        if not self._reload_lock.acquire(blocking=wait):
+            return
+        try:
+            if wait and self._loaded:
+                return  # chargé par un autre thread pendant l'attente
+            self._swap(db.query(
+                SeatModel.id, SeatModel.section, SeatModel.row, SeatModel.position, SeatModel.is_available
+            ).filter(
+                SeatModel.section.isnot(None), SeatModel.row.isnot(None), SeatModel.position.isnot(None)
+            ).all())
+        finally:
+            self._reload_lock.release()
+
+    def _reload_row(self, db: Session, key: RowKey):
+        section, row = key
+        seats = db.query(SeatModel.id, SeatModel.position, SeatModel.is_available).filter(
+            SeatModel.section == section, SeatModel.row == row
+        ).all()
+        with self._lock:
+            previous = self._rows.pop(key, None)
+            if previous is not None:
+                for seat_id in previous.seat_ids.values():
+                    self._seat_rows.pop(seat_id, None)
+            for seat_id, position, is_available in seats:
+                if position is not None:
+                    _add(self._rows, self._seat_rows, seat_id, section, row, position, is_available)
+            if (previous is not None) != (key in self._rows):
+                self._ordered = sorted(self._rows, key=row_order)
+
+    def add_seat(self, seat_id: int, section: Optional[str], row: Optional[int], position: Optional[int]):
+        with self._lock:
+            if self._loaded and section is not None and row is not None and position is not None:
+                if _add(self._rows, self._seat_rows, seat_id, section, row, position, True):
+                    self._ordered = sorted(self._rows, key=row_order)
+
+    def set_available(self, seat_id: int, available: bool):
+        """Mettre à jour l'index après une réservation ou une annulation"""
+        with self._lock:
+            location = self._seat_rows.get(seat_id)
+            if location is None:
+                return
+            key, position = location
+            bit = 1 << (position - 1)
+            index = self._rows[key]
+            if available:
+                index.free |= bit
+            else:
+                index.free &= ~bit
+
+    def find(self, db: Optional[Session], quantity: int,
+             section: Optional[str] = None) -> Optional[Tuple[RowKey, List[int]]]:
+        """
+        Meilleur bloc de quantity places contiguës : premier rang (dans l'ordre
+        de préférence) qui en contient un, au plus près du centre du rang.
+        Retourne (rang, seat_ids) ou None. Sans db, l'index est tenu à jour
+        par l'appelant (moteur en mémoire) et n'est jamais rechargé.
+        """
+        if db is not None and not self._loaded:
+            self._reload(db, wait=True)
+        with self._lock:
+            found = self._search(quantity, section)
+            loaded_at = self._loaded_at
+        if found is None and db is not None and time.monotonic() - loaded_at >= self.reload_interval:
+            # Places libérées ou ajoutées par d'autres workers : recharger avant de conclure
+            self._reload(db, wait=False)
+            with self._lock:
+                found = self._search(quantity, section)
+        return found
+
+    def _search(self, quantity: int, section: Optional[str]) -> Optional[Tuple[RowKey, List[int]]]:
+        for key in self._ordered:
+            if section is not None and key[0] != section:
+                continue
+            index = self._rows[key]
+            if not index.free or index.width < quantity:
+                continue
+            starts = _runs_start_mask(index.free, quantity)
+            if not starts:
+                continue
+            # Départ idéal : bloc centré dans le rang
+            ideal = (index.width - quantity) // 2
+            best = None
+            while starts:
+                low = starts & -starts
+                start = low.bit_length() - 1
+                if best is None or abs(start - ideal) < abs(best - ideal):
+                    best = start
+                if start >= ideal:
+                    break
+                starts ^= low
+            positions = range(best + 1, best + 1 + quantity)
+            return key, [index.seat_ids[p] for p in positions]
+        return None
+
+    def claimed_elsewhere(self, db: Session, key: RowKey):
+        """La réservation a échoué : l'index du rang était périmé"""
+        self._reload_row(db, key)
+
+seat_allocator = SeatAllocator(reload_interval=settings.seat_index_reload_interval)
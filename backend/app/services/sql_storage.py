@@ -0,0 +1,313 @@
+"""
+Implémentation SQL (SQLAlchemy) du stockage des sièges, réservations et conflits.
+
+Les listes sont lues par projection de colonnes (pas d'objets ORM par ligne)
+et les réservations reposent sur des UPDATE conditionnels : compare-and-swap
+sur la version du siège, ou sur is_available pour un bloc de places.
+"""
+import json
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.core.config import settings
+from app.models import (
+    Reservation as ReservationModel, Seat as SeatModel, Conflict as ConflictModel, TimeLog as TimeLogModel
+)
+from app.services.seat_allocator import seat_allocator, seat_layout
+from app.services.storage import ConcurrentModification, ReservationStorage
+from app.services.time_offsets_store import time_offsets
+from app.services.time_series import get_history
+from app.services.time_service import get_current_time
+from app.services.write_buffer import write_buffer
+
+SEAT_FIELDS = ("number", "id", "is_available", "created_at", "section", "row", "position")
+SEAT_COLUMNS = tuple(getattr(SeatModel, field) for field in SEAT_FIELDS)
+RESERVATION_FIELDS = ("customer_name", "id", "seat_id", "reserved_at", "server_id", "ntp_synced")
+RESERVATION_COLUMNS = tuple(getattr(ReservationModel, field) for field in RESERVATION_FIELDS)
+CONFLICT_FIELDS = ("seat_id", "time_difference_seconds", "id", "reservation_ids", "detected_at", "resolved")
+CONFLICT_COLUMNS = tuple(getattr(ConflictModel, field) for field in CONFLICT_FIELDS)
+
+def _object_dict(obj, fields) -> dict:
+    return {field: getattr(obj, field) for field in fields}
+
+class SqlReservationStorage(ReservationStorage):
+    def __init__(self, db: Session):
+        self.db = db
+
+    # Sièges
+
+    def list_seats(self, skip: int = 0, limit: int = 100) -> List[dict]:
+        rows = self.db.query(*SEAT_COLUMNS).offset(skip).limit(limit).all()
+        return [dict(zip(SEAT_FIELDS, row)) for row in rows]
+
+    def get_seat(self, seat_id: int) -> dict:
+        row = self.db.query(*SEAT_COLUMNS).filter(SeatModel.id == seat_id).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Seat not found")
+        return dict(zip(SEAT_FIELDS, row))
+
+    def create_seat(self, number: int, section: Optional[str] = None, row: Optional[int] = None,
+                    position: Optional[int] = None) -> dict:
+        db = self.db
+        # Vérifier si le siège existe déjà
+        existing_seat = db.query(SeatModel.id).filter(SeatModel.number == number).first()
+        if existing_seat:
+            raise HTTPException(status_code=400, detail="Seat number already exists")
+
+        db_seat = SeatModel(number=number, section=section, row=row, position=position)
+        db.add(db_seat)
+        db.commit()
+        db.refresh(db_seat)
+        seat_allocator.add_seat(db_seat.id, db_seat.section, db_seat.row, db_seat.position)
+        return _object_dict(db_seat, SEAT_FIELDS)
+
+    def initialize_seats(self, total_seats: int, seats_per_row: int = 10, rows_per_section: int = 5):
+        db = self.db
+        # Supprimer les sièges existants
+        db.query(SeatModel).delete()
+
+        # Créer les nouveaux sièges, répartis en sections / rangs
+        for i in range(1, total_seats + 1):
+            section, row, position = seat_layout(i, seats_per_row, rows_per_section)
+            db.add(SeatModel(number=i, section=section, row=row, position=position, is_available=True))
+
+        db.commit()
+        seat_allocator.invalidate()
+
+    def search_seats(self, quantity: int, section: Optional[str] = None) -> List[dict]:
+        found = seat_allocator.find(self.db, quantity, section)
+        if found is None:
+            return []
+        _, seat_ids = found
+        rows = self.db.query(*SEAT_COLUMNS).filter(
+            SeatModel.id.in_(seat_ids)
+        ).order_by(SeatModel.position).all()
+        return [dict(zip(SEAT_FIELDS, row)) for row in rows]
+
+    # Réservations
+
+    def reserve(self, seat_id: int, customer_name: str, server_id: str = "server-1") -> dict:
+        db = self.db
+        lost_race = False
+        for _ in range(settings.reservation_max_retries):
+            seat = db.query(SeatModel).filter(SeatModel.id == seat_id).first()
+            if not seat:
+                raise HTTPException(status_code=404, detail="Seat not found")
+
+            if not seat.is_available:
+                if lost_race:
+                    # Pris par une requête concurrente : pas de repli sur la fenêtre de drift
+                    raise HTTPException(status_code=409, detail="Seat was reserved concurrently")
+
+                last_res = db.query(ReservationModel).filter(
+                    ReservationModel.seat_id == seat_id
+                ).order_by(ReservationModel.reserved_at.desc()).first()
+                if not _in_drift_window(last_res, server_id):
+                    raise HTTPException(status_code=400, detail="Seat is already reserved")
+
+            # Compare-and-swap sur la version lue : échoue si le siège a changé entre-temps
+            claimed = db.query(SeatModel).filter(
+                SeatModel.id == seat.id,
+                SeatModel.version == seat.version
+            ).update(
+                {SeatModel.is_available: False, SeatModel.version: seat.version + 1},
+                synchronize_session=False
+            )
+            if not claimed:
+                db.rollback()
+                lost_race = True
+                continue
+
+            current_time, ntp_synced, offset = get_current_time(server_id)
+
+            db_reservation = ReservationModel(
+                seat_id=seat_id,
+                customer_name=customer_name,
+                reserved_at=current_time,
+                server_id=server_id,
+                ntp_synced=ntp_synced
+            )
+
+            db.add(db_reservation)
+            db.commit()
+            db.refresh(db_reservation)
+            db.refresh(seat)
+            seat_allocator.set_available(seat.id, False)
+
+            check_and_create_conflicts(db, seat_id)
+
+            payload = _object_dict(db_reservation, RESERVATION_FIELDS)
+            payload["seat"] = _object_dict(seat, SEAT_FIELDS)
+            return payload
+
+        raise ConcurrentModification()
+
+    def reserve_best_available(self, customer_name: str, quantity: int, section: Optional[str] = None,
+                               server_id: str = "server-1") -> List[dict]:
+        db = self.db
+        for _ in range(settings.reservation_max_retries):
+            found = seat_allocator.find(db, quantity, section)
+            if found is None:
+                raise HTTPException(status_code=409, detail="Not enough contiguous seats available")
+            row_key, seat_ids = found
+
+            # Réservation atomique du bloc : toutes les places doivent encore être libres
+            claimed = db.query(SeatModel).filter(
+                SeatModel.id.in_(seat_ids),
+                SeatModel.is_available == True
+            ).update(
+                {SeatModel.is_available: False, SeatModel.version: SeatModel.version + 1},
+                synchronize_session=False
+            )
+            if claimed != len(seat_ids):
+                db.rollback()
+                seat_allocator.claimed_elsewhere(db, row_key)
+                continue
+
+            current_time, ntp_synced, offset = get_current_time(server_id)
+            reservations = [
+                ReservationModel(
+                    seat_id=seat_id,
+                    customer_name=customer_name,
+                    reserved_at=current_time,
+                    server_id=server_id,
+                    ntp_synced=ntp_synced
+                )
+                for seat_id in seat_ids
+            ]
+            db.add_all(reservations)
+            db.flush()
+            reservation_ids = [r.id for r in reservations]
+            db.commit()
+
+            for seat_id in seat_ids:
+                seat_allocator.set_available(seat_id, False)
+
+            return _reservations_payload(
+                self._reservations_query().filter(
+                    ReservationModel.id.in_(reservation_ids)
+                ).order_by(SeatModel.position)
+            )
+
+        raise ConcurrentModification("Seats were modified concurrently, please retry")
+
+    def cancel(self, reservation_id: int) -> dict:
+        db = self.db
+        for _ in range(settings.reservation_max_retries):
+            reservation = db.query(ReservationModel).filter(ReservationModel.id == reservation_id).first()
+            if not reservation:
+                raise HTTPException(status_code=404, detail="Reservation not found")
+
+            seat = db.query(SeatModel).filter(SeatModel.id == reservation.seat_id).first()
+            if seat:
+                seat.is_available = True
+
+            db.delete(reservation)
+            try:
+                db.commit()
+            except StaleDataError:
+                # Le siège a été modifié par une autre requête : relire et réessayer
+                db.rollback()
+                continue
+            if seat:
+                seat_allocator.set_available(seat.id, True)
+            return {"message": "Reservation cancelled successfully"}
+
+        raise ConcurrentModification()
+
+    def _reservations_query(self):
+        # Siège récupéré par jointure dans la même requête (pas de lazy-load par ligne)
+        return self.db.query(*RESERVATION_COLUMNS, *SEAT_COLUMNS).outerjoin(
+            SeatModel, ReservationModel.seat_id == SeatModel.id
+        )
+
+    def list_reservations(self, skip: int = 0, limit: int = 100) -> List[dict]:
+        return _reservations_payload(self._reservations_query().offset(skip).limit(limit).all())
+
+    def list_conflicts(self) -> List[dict]:
+        return [dict(zip(CONFLICT_FIELDS, row)) for row in self.db.query(*CONFLICT_COLUMNS).all()]
+
+    # Synchronisation NTP
+
+    def record_sync(self, server_id: str, at: datetime, ntp_synced: bool, offset_seconds: float):
+        # Log non critique : insertion différée par lots
+        write_buffer.add(TimeLogModel, {
+            "server_id": server_id,
+            "timestamp": at,
+            "created_at": at,
+            "ntp_synced": ntp_synced,
+            "offset_seconds": offset_seconds,
+            "ntp_server": settings.ntp_server,
+        })
+
+    def last_sync(self, server_id: str) -> Optional[datetime]:
+        last_log = self.db.query(TimeLogModel.created_at).filter(
+            TimeLogModel.server_id == server_id
+        ).order_by(TimeLogModel.created_at.desc()).first()
+        return last_log.created_at if last_log else None
+
+    def time_history(self, server_id: str, since: datetime) -> List[dict]:
+        return get_history(self.db, server_id, since)
+
+def _reservations_payload(rows) -> List[dict]:
+    split = len(RESERVATION_FIELDS)
+    payload = []
+    for row in rows:
+        item = dict(zip(RESERVATION_FIELDS, row[:split]))
+        seat = row[split:]
+        item["seat"] = dict(zip(SEAT_FIELDS, seat)) if seat[1] is not None else None
+        payload.append(item)
+    return payload
+
+def _in_drift_window(last_res: Optional[ReservationModel], server_id: str) -> bool:
+    """
+    Fenêtre de démonstration du drift : une seconde réservation du même siège
+    n'est acceptée que depuis un autre serveur, de décalage simulé différent,
+    dans les 10 secondes (heure locale de ce serveur)
+    """
+    if not settings.drift_window_enabled or last_res is None or last_res.server_id == server_id:
+        return False
+    if time_offsets.get(last_res.server_id, 0.0) == time_offsets.get(server_id, 0.0):
+        return False
+    now, _, _ = get_current_time(server_id)
+    return abs((now - last_res.reserved_at).total_seconds()) <= 10
+
+def check_and_create_conflicts(db: Session, seat_id: int):
+    """Détecter un conflit réel basé sur les heures corrigées du drift"""
+
+    reservations = db.query(ReservationModel).filter(
+        ReservationModel.seat_id == seat_id
+    ).order_by(ReservationModel.reserved_at.desc()).limit(10).all()
+
+    if len(reservations) <= 1:
+        return
+
+    corrected_times = []
+    offsets = []
+    for r in reservations:
+        offset = time_offsets.get(r.server_id, 0.0)
+        offsets.append(offset)
+        corrected_time = r.reserved_at - timedelta(seconds=offset)
+        corrected_times.append(corrected_time)
+
+    # Pas de conflit s’il n’y a qu’un seul offset (i.e. serveurs synchronisés)
+    if len(set(offsets)) <= 1:
+        return
+
+    time_diff = (max(corrected_times) - min(corrected_times)).total_seconds()
+
+    if time_diff <= 10:
+        reservation_ids = [str(r.id) for r in reservations]
+
+        # Enregistrement non critique : insertion différée par lots
+        write_buffer.add(ConflictModel, {
+            "seat_id": seat_id,
+            "reservation_ids": json.dumps(reservation_ids),
+            "detected_at": datetime.utcnow(),
+            "time_difference_seconds": time_diff,
+            "resolved": False,
+        })
@@ -0,0 +1,118 @@
+"""
+Stockage des sièges, réservations et conflits utilisé par app.api.seats et
+app.api.reservations.
+
+Deux implémentations, choisies par settings.storage_backend :
+- "sql" : SqlReservationStorage (app.services.sql_storage), une instance par
+  requête liée à une session SQLAlchemy (primaire ou réplique)
+- "memory" : MemoryReservationStore (app.services.memory_store), moteur en
+  mémoire partagé, sans base de données
+
+Les méthodes retournent des dicts / listes de dicts prêts à sérialiser et
+lèvent des HTTPException (404, 400, 409) comme les routes.
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import HTTPException, Request
+
+from app.core.config import settings
+
+class ConcurrentModification(HTTPException):
+    """
+    409 transitoire (tentatives épuisées face à des écritures concurrentes) :
+    la même requête peut réussir si elle est renvoyée, elle n'est donc pas
+    mémorisée pour son Idempotency-Key
+    """
+
+    def __init__(self, detail: str = "Seat was modified concurrently, please retry"):
+        super().__init__(status_code=409, detail=detail)
+
+class ReservationStorage(ABC):
+    # Sièges
+
+    @abstractmethod
+    def list_seats(self, skip: int = 0, limit: int = 100) -> List[dict]:
+        ...
+
+    @abstractmethod
+    def get_seat(self, seat_id: int) -> dict:
+        ...
+
+    @abstractmethod
+    def create_seat(self, number: int, section: Optional[str] = None, row: Optional[int] = None,
+                    position: Optional[int] = None) -> dict:
+        ...
+
+    @abstractmethod
+    def initialize_seats(self, total_seats: int, seats_per_row: int = 10, rows_per_section: int = 5):
+        ...
+
+    @abstractmethod
+    def search_seats(self, quantity: int, section: Optional[str] = None) -> List[dict]:
+        """Meilleures places contiguës disponibles (sans les réserver)"""
+        ...
+
+    # Réservations
+
+    @abstractmethod
+    def reserve(self, seat_id: int, customer_name: str, server_id: str = "server-1") -> dict:
+        ...
+
+    @abstractmethod
+    def reserve_best_available(self, customer_name: str, quantity: int, section: Optional[str] = None,
+                               server_id: str = "server-1") -> List[dict]:
+        ...
+
+    @abstractmethod
+    def cancel(self, reservation_id: int) -> dict:
+        ...
+
+    @abstractmethod
+    def list_reservations(self, skip: int = 0, limit: int = 100) -> List[dict]:
+        ...
+
+    @abstractmethod
+    def list_conflicts(self) -> List[dict]:
+        ...
+
+    # Synchronisation NTP
+
+    @abstractmethod
+    def record_sync(self, server_id: str, at: datetime, ntp_synced: bool, offset_seconds: float):
+        """Enregistrer une synchronisation NTP (insertion éventuellement différée)"""
+        ...
+
+    @abstractmethod
+    def last_sync(self, server_id: str) -> Optional[datetime]:
+        ...
+
+    @abstractmethod
+    def time_history(self, server_id: str, since: datetime) -> List[dict]:
+        """Offsets agrégés par minute depuis `since` (404 si non disponible)"""
+        ...
+
+def _storage(read_only: bool, request: Request):
+    if settings.storage_backend == "memory":
+        from app.services.memory_store import memory_store
+        yield memory_store
+        return
+
+    from app.core.database import get_db, get_read_db
+    from app.services.sql_storage import SqlReservationStorage
+
+    sessions = get_read_db(request) if read_only else get_db(request)
+    db = next(sessions)
+    try:
+        yield SqlReservationStorage(db)
+    finally:
+        sessions.close()
+
+def get_storage(request: Request):
+    """Stockage pour les requêtes qui écrivent (session sur le primaire)"""
+    yield from _storage(False, request)
+
+def get_read_storage(request: Request):
+    """Stockage pour les lectures (réplique si configurée)"""
+    yield from _storage(True, request)
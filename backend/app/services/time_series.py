@@ -0,0 +1,234 @@
+"""
+Stockage time-series des logs de synchronisation NTP (table time_logs).
+
+Deux modes :
+- "timescale" : time_logs est une hypertable TimescaleDB, avec une
+  politique de rétention et un agrégat continu par minute (time_logs_1m),
+  créés par la migration Alembic 0004.
+- "plain" : PostgreSQL sans extension ou SQLite (tests locaux). Les agrégats
+  par minute sont matérialisés dans time_log_rollups par un thread de fond
+  (rollup_refresher), qui applique aussi la rétention ; les lectures
+  d'historique ne font qu'interroger cette table.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import TimeLog as TimeLogModel, TimeLogRollup as TimeLogRollupModel
+
+ROLLUP_VIEW = "time_logs_1m"
+ROLLUP_LOCK_KEY = 727001  # verrou consultatif PostgreSQL du rafraîchissement
+
+_backend: Optional[str] = None
+
+def get_backend() -> str:
+    """Mode de stockage actif ("timescale" ou "plain")"""
+    return _backend or "plain"
+
+def _timescale_ready(engine: Engine) -> bool:
+    if engine.dialect.name != "postgresql":
+        return False
+    with engine.connect() as conn:
+        return conn.execute(text(f"SELECT to_regclass('{ROLLUP_VIEW}') IS NOT NULL")).scalar()
+
+def setup_time_series(engine: Engine) -> str:
+    """
+    Choisir le stockage time-series selon settings.time_series_backend.
+    Aucun DDL au démarrage : l'hypertable, l'agrégat continu et la rétention
+    sont créés par la migration Alembic 0004.
+    """
+    global _backend
+
+    wanted = settings.time_series_backend
+    if wanted != "plain" and _timescale_ready(engine):
+        _backend = "timescale"
+    else:
+        if wanted == "timescale":
+            print("TimescaleDB non configuré : exécuter 'alembic upgrade head' "
+                  "(stockage plain en attendant)")
+        _backend = "plain"
+    return _backend
+
+def _minute(dt: datetime) -> datetime:
+    return dt.replace(second=0, microsecond=0)
+
+def refresh_rollups(db: Session) -> int:
+    """
+    Recalculer time_log_rollups à partir des logs bruts (mode "plain").
+    Les buckets de la fenêtre glissante (time_log_rollup_window_minutes, et
+    au-delà jusqu'au dernier bucket matérialisé) sont supprimés puis réinsérés
+    dans une seule transaction, ce qui intègre les logs flushés en retard.
+    Retourne le nombre de buckets écrits, ou -1 si un autre processus rafraîchit.
+    """
+    if db.bind.dialect.name == "postgresql":
+        # Un seul écrivain même avec plusieurs workers
+        if not db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": ROLLUP_LOCK_KEY}).scalar():
+            db.rollback()
+            return -1
+
+    now = datetime.utcnow()
+    db.query(TimeLogModel).filter(
+        TimeLogModel.created_at < now - timedelta(days=settings.time_logs_retention_days)
+    ).delete(synchronize_session=False)
+    db.query(TimeLogRollupModel).filter(
+        TimeLogRollupModel.bucket < now - timedelta(days=settings.time_log_rollups_retention_days)
+    ).delete(synchronize_session=False)
+
+    last_bucket = db.query(TimeLogRollupModel.bucket).order_by(
+        TimeLogRollupModel.bucket.desc()
+    ).limit(1).scalar()
+
+    query = db.query(
+        TimeLogModel.server_id,
+        TimeLogModel.created_at,
+        TimeLogModel.ntp_synced,
+        TimeLogModel.offset_seconds,
+    )
+    window_start = None
+    if last_bucket is not None:
+        # Premier passage (table vide) : tout l'historique disponible
+        window_start = min(
+            last_bucket.replace(tzinfo=None),
+            _minute(now - timedelta(minutes=settings.time_log_rollup_window_minutes)),
+        )
+        db.query(TimeLogRollupModel).filter(
+            TimeLogRollupModel.bucket >= window_start
+        ).delete(synchronize_session=False)
+        # Marge d'une seconde : SQLite compare les dates sous forme de chaînes
+        query = query.filter(TimeLogModel.created_at >= window_start - timedelta(seconds=1))
+
+    buckets = {}
+    for server_id, created_at, ntp_synced, offset in query:
+        if created_at is None:
+            continue
+        bucket = _minute(created_at.replace(tzinfo=None))
+        if window_start is not None and bucket < window_start:
+            continue
+        offset = offset or 0.0
+        agg = buckets.get((server_id, bucket))
+        if agg is None:
+            buckets[(server_id, bucket)] = [1, int(bool(ntp_synced)), offset, offset, offset]
+        else:
+            agg[0] += 1
+            agg[1] += int(bool(ntp_synced))
+            agg[2] += offset
+            agg[3] = min(agg[3], offset)
+            agg[4] = max(agg[4], offset)
+
+    if buckets:
+        db.bulk_insert_mappings(TimeLogRollupModel, [
+            {
+                "server_id": server_id,
+                "bucket": bucket,
+                "sample_count": count,
+                "synced_count": synced,
+                "avg_offset": total / count,
+                "min_offset": low,
+                "max_offset": high,
+            }
+            for (server_id, bucket), (count, synced, total, low, high) in buckets.items()
+        ])
+    db.commit()
+    return len(buckets)
+
+class RollupRefresher:
+    """Thread de fond, seul écrivain de time_log_rollups (mode "plain")"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.last_refresh_ms = 0.0
+        self.last_buckets = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def refresh(self) -> int:
+        from app.core.database import SessionLocal
+
+        start = time.perf_counter()
+        db = SessionLocal()
+        try:
+            written = refresh_rollups(db)
+        except Exception as e:
+            db.rollback()
+            self.refresh_errors += 1
+            print(f"Erreur lors du rafraîchissement des agrégats: {e}")
+            return 0
+        finally:
+            db.close()
+
+        self.refreshes += 1
+        self.last_refresh_ms = (time.perf_counter() - start) * 1000
+        self.last_buckets = written
+        return written
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Démarrer le rafraîchissement périodique"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="rollup-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 5)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "last_refresh_ms": round(self.last_refresh_ms, 3),
+            "last_buckets": self.last_buckets,
+        }
+
+rollup_refresher = RollupRefresher(interval=settings.time_log_rollup_interval)
+
+def get_history(db: Session, server_id: str, since: datetime) -> List[dict]:
+    """Historique des offsets par minute pour un serveur, lu depuis les agrégats"""
+    if get_backend() == "timescale":
+        rows = db.execute(text(f"""
+            SELECT server_id, bucket, sample_count, synced_count,
+                   avg_offset, min_offset, max_offset
+            FROM {ROLLUP_VIEW}
+            WHERE server_id = :server_id AND bucket >= :since
+            ORDER BY bucket
+        """), {"server_id": server_id, "since": since}).mappings().all()
+        return [dict(row) for row in rows]
+
+    rows = db.query(TimeLogRollupModel).filter(
+        TimeLogRollupModel.server_id == server_id,
+        TimeLogRollupModel.bucket >= since,
+    ).order_by(TimeLogRollupModel.bucket).all()
+    return [
+        {
+            "server_id": r.server_id,
+            "bucket": r.bucket,
+            "sample_count": r.sample_count,
+            "synced_count": r.synced_count,
+            "avg_offset": r.avg_offset,
+            "min_offset": r.min_offset,
+            "max_offset": r.max_offset,
+        }
+        for r in rows
+    ]
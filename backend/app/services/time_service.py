@@ -1,4 +1,3 @@
-import ntplib
 from datetime import datetime, timedelta
 import time
 from typing import Tuple
@@ -26,6 +25,9 @@ def sync_with_ntp(ntp_server: str = "pool.ntp.org") -> Tuple[bool, float]:
     Retourne: (success, offset_seconds)
     """
     try:
+        # Import différé : ntplib n'est nécessaire qu'au moment d'une synchronisation
+        import ntplib
+
         client = ntplib.NTPClient()
         response = client.request(ntp_server, version=3)
         
@@ -0,0 +1,144 @@
+"""
+Buffer write-behind pour les insertions non critiques (logs NTP, conflits).
+
+Les lignes sont accumulées en mémoire puis insérées par lots (INSERT multi-lignes)
+par un thread de fond, dès que le seuil de taille ou l'intervalle de temps est
+atteint. La capacité est bornée : au-delà, les nouvelles lignes sont rejetées et
+comptabilisées.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+
+class WriteBehindBuffer:
+    def __init__(self, max_rows: int, flush_interval: float, capacity: int):
+        self.max_rows = max_rows
+        self.flush_interval = flush_interval
+        self.capacity = capacity
+
+        self._rows = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.rows_dropped = 0
+        self.flush_errors = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def add(self, model, values: Dict[str, Any]) -> bool:
+        """Mettre une ligne en attente d'insertion. Retourne False si rejetée."""
+        if not self.running:
+            # Pas de thread de fond (scripts, désactivé) : écriture immédiate
+            with self._lock:
+                self._rows.append((model, values))
+            self.flush()
+            return True
+
+        with self._lock:
+            if len(self._rows) >= self.capacity:
+                self.rows_dropped += 1
+                return False
+            self._rows.append((model, values))
+            pending = len(self._rows)
+
+        if pending >= self.max_rows:
+            self._wakeup.set()
+        return True
+
+    def flush(self) -> int:
+        """Insérer toutes les lignes en attente, regroupées par table"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._rows:
+                    return 0
+                batch = list(self._rows)
+                self._rows.clear()
+
+            by_model = {}
+            for model, values in batch:
+                by_model.setdefault(model, []).append(values)
+
+            from app.core.database import SessionLocal
+
+            start = time.perf_counter()
+            db = SessionLocal()
+            try:
+                for model, rows in by_model.items():
+                    db.execute(insert(model), rows)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                self.flush_errors += 1
+                self.rows_dropped += len(batch)
+                print(f"Erreur lors du flush du buffer d'écriture: {e}")
+                return 0
+            finally:
+                db.close()
+
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.flushes += 1
+            self.rows_flushed += len(batch)
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+            self.total_flush_ms += elapsed_ms
+            return len(batch)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def start(self):
+        """Démarrer le thread de flush périodique"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Arrêter le thread et vider le buffer"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+            self._thread = None
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._rows)
+        return {
+            "running": self.running,
+            "pending_rows": pending,
+            "capacity": self.capacity,
+            "flushes": self.flushes,
+            "rows_flushed": self.rows_flushed,
+            "rows_dropped": self.rows_dropped,
+            "flush_errors": self.flush_errors,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "max_flush_ms": round(self.max_flush_ms, 3),
+            "avg_flush_ms": round(self.total_flush_ms / self.flushes, 3) if self.flushes else 0.0,
+        }
+
+write_buffer = WriteBehindBuffer(
+    max_rows=settings.write_buffer_max_rows,
+    flush_interval=settings.write_buffer_flush_interval,
+    capacity=settings.write_buffer_capacity,
+)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark de sérialisation des endpoints de liste (sièges, réservations, conflits).
+
+Compare, pour des réponses de N lignes :
+- "pydantic" : chargement d'objets ORM puis validation/sérialisation Pydantic et
+  json de la stdlib (chemin response_model de FastAPI, seat chargé par selectinload)
+- "orjson"   : projection de colonnes sérialisée directement (chemin actuel,
+  via SqlReservationStorage)
+
+Usage (depuis backend/) :
+    python benchmarks/bench_list_serialization.py --rows 10000 --repeat 5
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import TypeAdapter
+from sqlalchemy.orm import selectinload
+
+from app.core.database import Base, engine, SessionLocal
+from app.models import Seat as SeatModel, Reservation as ReservationModel, Conflict as ConflictModel
+from app.schemas import Seat, Reservation, Conflict
+from app.api.seats import get_seats
+from app.api.reservations import get_reservations, get_conflicts
+from app.services.sql_storage import SqlReservationStorage
+
+def populate(rows: int):
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+    db = SessionLocal()
+    db.bulk_insert_mappings(SeatModel, [
+        {"id": i, "number": i, "is_available": i % 2 == 0, "version": 1, "created_at": now}
+        for i in range(1, rows + 1)
+    ])
+    db.bulk_insert_mappings(ReservationModel, [
+        {
+            "id": i, "seat_id": i, "customer_name": f"Client_{i}",
+            "reserved_at": now - timedelta(seconds=i), "server_id": f"server-{i % 5 + 1}",
+            "ntp_synced": i % 3 == 0,
+        }
+        for i in range(1, rows + 1)
+    ])
+    db.bulk_insert_mappings(ConflictModel, [
+        {
+            "id": i, "seat_id": i, "reservation_ids": json.dumps([str(i), str(i + 1)]),
+            "detected_at": now, "time_difference_seconds": 1.5, "resolved": False,
+        }
+        for i in range(1, rows + 1)
+    ])
+    db.commit()
+    db.close()
+
+def pydantic_path(model, schema, rows: int, options=()) -> bytes:
+    db = SessionLocal()
+    try:
+        # Les relations sont en lazy="raise_on_sql" : chargement explicite
+        objects = db.query(model).options(*options).limit(rows).all()
+        adapter = TypeAdapter(List[schema])
+        validated = adapter.validate_python(objects, from_attributes=True)
+        return json.dumps(adapter.dump_python(validated, mode="json")).encode()
+    finally:
+        db.close()
+
+def orjson_path(endpoint, rows: int, **kwargs) -> bytes:
+    db = SessionLocal()
+    try:
+        return endpoint(storage=SqlReservationStorage(db), **kwargs).body
+    finally:
+        db.close()
+
+def measure(label: str, func, rows: int, repeat: int):
+    func()  # échauffement
+    wall, cpu = [], []
+    for _ in range(repeat):
+        w0, c0 = time.perf_counter(), time.process_time()
+        body = func()
+        wall.append(time.perf_counter() - w0)
+        cpu.append(time.process_time() - c0)
+    best_wall = min(wall)
+    print(f"  {label:<9} {rows / best_wall:>12,.0f} rows/s   "
+          f"wall {best_wall * 1000:>8.1f} ms   cpu {min(cpu) * 1000:>8.1f} ms/response   "
+          f"{len(body) / 1024:>8.0f} KiB")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de sérialisation des listes")
+    parser.add_argument("--rows", type=int, default=10000, help="Nombre de lignes par réponse")
+    parser.add_argument("--repeat", type=int, default=5, help="Nombre de mesures (meilleure retenue)")
+    args = parser.parse_args()
+
+    populate(args.rows)
+    n = args.rows
+
+    cases = [
+        ("GET /api/seats/", SeatModel, Seat, (),
+         lambda: orjson_path(get_seats, n, skip=0, limit=n)),
+        ("GET /api/reservations/", ReservationModel, Reservation, (selectinload(ReservationModel.seat),),
+         lambda: orjson_path(get_reservations, n, skip=0, limit=n)),
+        ("GET /api/reservations/conflicts", ConflictModel, Conflict, (),
+         lambda: orjson_path(get_conflicts, n)),
+    ]
+    for title, model, schema, options, fast in cases:
+        print(f"{title} ({n} lignes)")
+        measure("pydantic", lambda: pydantic_path(model, schema, n, options), n, args.repeat)
+        measure("orjson", fast, n, args.repeat)
+
+if __name__ == "__main__":
+    main()
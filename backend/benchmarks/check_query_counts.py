@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Vérifie que les endpoints de liste émettent un nombre constant de requêtes SQL,
+quelle que soit la taille du résultat (détection des N+1).
+
+Chaque endpoint est appelé sur une petite puis une grande base ; le script
+échoue (code de sortie 1) si le nombre de requêtes dépasse le budget ou varie
+avec le volume.
+
+Usage (depuis backend/) :
+    python benchmarks/check_query_counts.py --small 5 --large 500
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "queries.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["WRITE_BUFFER_ENABLED"] = "false"
+os.environ["TIME_LOG_ROLLUP_INTERVAL"] = "0"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+
+from app.core.database import Base, engine, SessionLocal
+from app.core.query_counter import count_queries
+from app.main import app
+from app.models import (
+    Seat as SeatModel,
+    Reservation as ReservationModel,
+    Conflict as ConflictModel,
+    TimeLog as TimeLogModel,
+)
+from app.services.time_series import rollup_refresher
+
+# Nombre maximal de requêtes SQL par appel
+QUERY_BUDGETS = {
+    "/api/seats/?limit=100000": 1,
+    "/api/reservations/?limit=100000": 1,
+    "/api/reservations/conflicts": 1,
+    "/api/time/status": 1,
+    "/api/time/history?minutes=100000": 1,
+}
+
+def populate(rows: int):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+    db = SessionLocal()
+    db.bulk_insert_mappings(SeatModel, [
+        {"id": i, "number": i, "is_available": False, "version": 1}
+        for i in range(1, rows + 1)
+    ])
+    db.bulk_insert_mappings(ReservationModel, [
+        {"seat_id": i, "customer_name": f"Client_{i}", "reserved_at": now, "server_id": "server-1"}
+        for i in range(1, rows + 1)
+    ])
+    db.bulk_insert_mappings(ConflictModel, [
+        {"seat_id": i, "reservation_ids": json.dumps([str(i)]), "detected_at": now,
+         "time_difference_seconds": 1.0}
+        for i in range(1, rows + 1)
+    ])
+    db.bulk_insert_mappings(TimeLogModel, [
+        {"server_id": "server-1", "created_at": now - timedelta(minutes=i), "offset_seconds": 0.01}
+        for i in range(rows)
+    ])
+    db.commit()
+    db.close()
+    rollup_refresher.refresh()
+
+def measure(client: TestClient, rows: int) -> dict:
+    populate(rows)
+    counts = {}
+    for url in QUERY_BUDGETS:
+        with count_queries() as counter:
+            response = client.get(url)
+        response.raise_for_status()
+        counts[url] = counter.count
+    return counts
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Vérification du nombre de requêtes SQL par endpoint")
+    parser.add_argument("--small", type=int, default=5, help="Nombre de lignes du petit jeu")
+    parser.add_argument("--large", type=int, default=500, help="Nombre de lignes du grand jeu")
+    args = parser.parse_args()
+
+    failures = 0
+    with TestClient(app) as client:
+        small = measure(client, args.small)
+        large = measure(client, args.large)
+
+    for url, budget in QUERY_BUDGETS.items():
+        ok = large[url] <= budget and small[url] == large[url]
+        failures += not ok
+        status = "OK  " if ok else "FAIL"
+        print(f"{status} {url:<36} {small[url]:>3} requêtes ({args.small} lignes)  "
+              f"{large[url]:>3} requêtes ({args.large} lignes)  budget {budget}")
+
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
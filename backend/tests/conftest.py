@@ -0,0 +1,36 @@
+"""
+Tests du backend sur une base SQLite temporaire, sans buffer d'écriture ni
+thread de rafraîchissement des agrégats. L'environnement est fixé avant
+l'import de l'application (settings lus à l'import).
+"""
+import os
+import tempfile
+
+_db_dir = tempfile.mkdtemp(prefix="ticket-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ["STORAGE_BACKEND"] = "sql"
+os.environ["WRITE_BUFFER_ENABLED"] = "false"
+os.environ["TIME_LOG_ROLLUP_INTERVAL"] = "0"
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import Base, engine
+from app.main import app
+from app.services.seat_allocator import seat_allocator
+from app.services.time_offsets_store import time_offsets
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    """Base vide et index / décalages remis à zéro pour chaque test"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    seat_allocator.invalidate()
+    time_offsets.clear()
+    yield
+    time_offsets.clear()
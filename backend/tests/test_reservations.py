@@ -0,0 +1,79 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import Query
+
+from app.core.database import SessionLocal
+from app.models import Reservation as ReservationModel, Seat as SeatModel
+
+def reserve(client, seat_id, customer_name="alice", server_id="server-1", headers=None):
+    return client.post(
+        "/api/reservations/reserve",
+        json={"seat_id": seat_id, "customer_name": customer_name},
+        params={"server_id": server_id},
+        headers=headers,
+    )
+
+def reservations_for(seat_id):
+    db = SessionLocal()
+    try:
+        return db.query(ReservationModel).filter(ReservationModel.seat_id == seat_id).count()
+    finally:
+        db.close()
+
+@pytest.fixture
+def seats(client):
+    client.post("/api/seats/initialize", params={"total_seats": 10})
+
+def test_reserve_then_second_reservation_rejected(client, seats):
+    assert reserve(client, 1).status_code == 200
+    response = reserve(client, 1, "bob", server_id="server-2")
+    assert response.status_code == 400
+    assert reservations_for(1) == 1
+
+def test_lost_cas_returns_409_without_drift_window(client, seats, monkeypatch):
+    # Décalages différents : la fenêtre de drift accepterait une seconde réservation
+    from app.services.time_offsets_store import time_offsets
+    time_offsets.update({"server-1": 0.0, "server-2": -5.0})
+
+    real_update = Query.update
+    raced = []
+
+    def racing_update(self, values, **kwargs):
+        if not raced:
+            # Un autre worker (server-1) réserve le siège entre la lecture et le CAS
+            raced.append(True)
+            db = SessionLocal()
+            seat = db.get(SeatModel, 3)
+            seat.is_available = False
+            db.add(ReservationModel(seat_id=3, customer_name="alice", reserved_at=datetime.utcnow(),
+                                    server_id="server-1", ntp_synced=True))
+            db.commit()
+            db.close()
+        return real_update(self, values, **kwargs)
+
+    monkeypatch.setattr(Query, "update", racing_update)
+    response = reserve(client, 3, "bob", server_id="server-2")
+
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Seat was reserved concurrently"
+    assert reservations_for(3) == 1
+    assert client.get("/api/reservations/conflicts").json() == []
+
+def test_idempotent_retry_returns_stored_body(client, seats):
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+    first = reserve(client, 2, headers=headers)
+    retry = reserve(client, 2, headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert reservations_for(2) == 1
+
+def test_idempotency_key_reused_with_other_payload(client, seats):
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+    assert reserve(client, 4, headers=headers).status_code == 200
+
+    response = reserve(client, 5, headers=headers)
+    assert response.status_code == 422
+    assert reservations_for(5) == 0
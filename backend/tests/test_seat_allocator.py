@@ -0,0 +1,48 @@
+from app.services.seat_allocator import SeatAllocator, _runs_start_mask, seat_layout
+
+def bits(*positions):
+    return sum(1 << p for p in positions)
+
+def allocator(total_seats, seats_per_row=10, rows_per_section=5, taken=()):
+    seats = []
+    for number in range(1, total_seats + 1):
+        section, row, position = seat_layout(number, seats_per_row, rows_per_section)
+        seats.append((number, section, row, position, number not in taken))
+    index = SeatAllocator()
+    index.load(seats)
+    return index
+
+def test_runs_start_mask():
+    assert _runs_start_mask(0b1111, 1) == 0b1111
+    assert _runs_start_mask(0b1111, 4) == 0b0001
+    assert _runs_start_mask(0b1111, 5) == 0
+    # Positions libres 0-2 et 4-8 : départs possibles pour 3 places
+    assert _runs_start_mask(bits(0, 1, 2, 4, 5, 6, 7, 8), 3) == bits(0, 4, 5, 6)
+    assert _runs_start_mask(0, 2) == 0
+
+def test_find_returns_centred_block():
+    index = allocator(10)
+    assert index.find(None, 2, None) == (("A", 1), [5, 6])
+    assert index.find(None, 4, None) == (("A", 1), [4, 5, 6, 7])
+
+def test_find_closest_block_to_centre():
+    # Centre du rang occupé : bloc libre le plus proche du départ idéal
+    index = allocator(10, taken={5, 6})
+    assert index.find(None, 2, None) == (("A", 1), [3, 4])
+
+def test_find_follows_section_order():
+    # 27 sections d'un rang (A..Z puis AA) : seules B et AA ont des places libres.
+    # AA vient après Z, donc après B (un tri de chaînes la placerait avant)
+    free = set(range(11, 21)) | set(range(261, 271))
+    index = allocator(27 * 10, rows_per_section=1, taken=set(range(1, 271)) - free)
+    assert index.find(None, 3, None)[0] == ("B", 1)
+
+    index.load([])
+    assert index.find(None, 3, None) is None
+
+def test_find_in_section_and_when_full():
+    index = allocator(20, rows_per_section=1)
+    assert index.find(None, 3, "B") == (("B", 1), [14, 15, 16])
+    assert index.find(None, 11, None) is None
+    index.set_available(15, False)
+    assert index.find(None, 10, "B") is None
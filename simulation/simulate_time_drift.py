@@ -5,11 +5,34 @@ Script de simulation de dérive temporelle pour démonstration NTP
 
 import asyncio
 import aiohttp
+import os
 import random
+import sys
 import time
 from datetime import datetime
 from typing import List, Dict
 
+SCENARIOS = {
+    "minor_drift": {
+        "server-1": 0.0,
+        "server-2": -1.0,
+        "server-3": 0.5
+    },
+    "major_drift": {
+        "server-1": 0.0,
+        "server-2": -10.0,
+        "server-3": 5.0,
+        "server-4": -3.0
+    },
+    "extreme_drift": {
+        "server-1": 0.0,
+        "server-2": -30.0,
+        "server-3": 15.0,
+        "server-4": -8.0,
+        "server-5": 12.0
+    }
+}
+
 class NTPSimulator:
     def __init__(self, api_base_url: str = "http://localhost:8000"):
         self.api_base_url = api_base_url
@@ -17,26 +40,7 @@ class NTPSimulator:
         
     async def setup_time_drift(self, scenario: str = "major_drift"):
         """Configure un scénario de dérive temporelle"""
-        scenarios = {
-            "minor_drift": {
-                "server-1": 0.0,
-                "server-2": -1.0,
-                "server-3": 0.5
-            },
-            "major_drift": {
-                "server-1": 0.0,
-                "server-2": -10.0,
-                "server-3": 5.0,
-                "server-4": -3.0
-            },
-            "extreme_drift": {
-                "server-1": 0.0,
-                "server-2": -30.0,
-                "server-3": 15.0,
-                "server-4": -8.0,
-                "server-5": 12.0
-            }
-        }
+        scenarios = SCENARIOS
         
         if scenario not in scenarios:
             print(f"Scénario '{scenario}' non trouvé. Utilisation de 'major_drift'")
@@ -208,6 +212,31 @@ async def run_full_demo():
     print("💡 Conclusion: La synchronisation NTP est essentielle pour éviter les conflits")
     print("   dans les systèmes distribués critiques comme les réservations.")
 
+def run_in_memory_replay(scenario: str, num_events: int, total_seats: int, rate: float, seed: int = 42):
+    """Rejoue des réservations simulées dans le moteur en mémoire du backend (sans API ni base)"""
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+    from app.services.memory_store import MemoryReservationStore
+
+    offsets = SCENARIOS[scenario]
+    servers = list(offsets)
+    store = MemoryReservationStore(offsets=dict(offsets))
+    store.initialize_seats(total_seats)
+
+    rng = random.Random(seed)
+    start = time.time()
+    interval = 1.0 / rate
+    events = [
+        (rng.randint(1, total_seats), f"Client_{i}", rng.choice(servers), start + i * interval)
+        for i in range(num_events)
+    ]
+
+    stats = store.replay(events)
+    print(f"🧪 {scenario}: {stats['attempts']:,} tentatives, {stats['accepted']:,} acceptées, "
+          f"{stats['rejected']:,} refusées, {stats['conflicts']:,} conflits "
+          f"({stats['seats_with_conflicts']:,} sièges) en {stats['elapsed_seconds']:.2f}s "
+          f"({stats['events_per_second']:,.0f} évts/s)")
+    return stats
+
 if __name__ == "__main__":
     import argparse
     
@@ -218,12 +247,21 @@ if __name__ == "__main__":
     parser.add_argument("--reservations", type=int, default=3, help="Nombre de réservations concurrentes")
     parser.add_argument("--full-demo", action="store_true", help="Lancer la démonstration complète")
     parser.add_argument("--reset", action="store_true", help="Arrêter toutes les simulations")
+    parser.add_argument("--in-memory", action="store_true",
+                        help="Rejouer les réservations dans le moteur en mémoire (sans API)")
+    parser.add_argument("--events", type=int, default=1_000_000, help="Nombre de réservations à rejouer (--in-memory)")
+    parser.add_argument("--seats", type=int, default=10_000, help="Nombre de sièges (--in-memory)")
+    parser.add_argument("--rate", type=float, default=1000.0, help="Tentatives par seconde simulée (--in-memory)")
     
     args = parser.parse_args()
     
     simulator = NTPSimulator()
     
-    if args.full_demo:
+    if args.in_memory:
+        scenarios = list(SCENARIOS) if args.full_demo else [args.scenario]
+        for scenario in scenarios:
+            run_in_memory_replay(scenario, args.events, args.seats, args.rate)
+    elif args.full_demo:
         asyncio.run(run_full_demo())
     elif args.reset:
         asyncio.run(simulator.reset_simulation())